@@ -0,0 +1,24 @@
+""" Ahead of time build of the compiled simulation core.
+Run once with 'python build_kernels.py' to write the mining_core extension next to this file.
+simulate_kernel imports it when present, skipping the numba JIT warm up on every fresh process.
+"""
+
+import os
+from numba.pycc import CC
+from simulate_kernel import run_kernel_py
+
+# Must follow the argument and result types of simulate_kernel.run_kernel_py.
+# The arrays are the TruckArray and StationArray fields, the idle station queue and the mining times.
+RUN_KERNEL_SIGNATURE = ('Tuple((int32[:, :], int32[:]))(int64, int8[:], int32[:], int32[:], int32[:], int32[:, :], '
+    'int8[:], int32[:], int32[:], int32[:], int32[:], int32[:], int32[:], int64, int64, int64, int64, int64)')
+
+def build():
+  """ Compile the simulation kernel into the mining_core extension module.
+  """
+  cc = CC('mining_core')
+  cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+  cc.export('run_kernel', RUN_KERNEL_SIGNATURE)(run_kernel_py)
+  cc.compile()
+
+if __name__ == '__main__':
+  build()
@@ -4,17 +4,27 @@ Stations are fixed locations where ore is ingested and stored.
 Trucks move back and forth between Stations and Mining sites.
 """
 
-from enum import Enum, unique, auto
-import random
-from dataclasses import dataclass
+import logging
+from enum import Enum, IntEnum, unique, auto
+from collections import deque
+from dataclasses import dataclass, field
+import numpy as np
+
+# Verbose output. Messages are only built when a component is verbose, and formatted only if debug logging is on.
+log = logging.getLogger(__name__)
 
 
 @unique
-class TruckStatus(Enum):
+class TruckStatus(IntEnum):
   """
       Static states that a truck can exist in.
       All trucks should always be in exactly one state.
+      An IntEnum, so state comparisons are plain integer compares.
+      Note TruckStatus and StationStatus values overlap, so never mix them as keys.
   """
+  # Keep 'TruckStatus.IDLE' style output, rather than the bare number IntEnum prints.
+  __str__ = Enum.__str__
+
   IDLE = auto()
   MINING = auto()
   UNLOADING = auto()
@@ -22,15 +32,52 @@ class TruckStatus(Enum):
   TRAVELING_TO_STATION = auto()
 
 @unique
-class StationStatus(Enum):
+class StationStatus(IntEnum):
   """
       Static states that a station can exist in.
       All stations should always be in exactly one state.
       This could be a boolean, but an enum allows future growth.
   """
+  __str__ = Enum.__str__
+
   IDLE = auto()
   BUSY = auto()
 
+# Integer state codes used by the simulation core, numba does not handle Enums.
+# Each code is the matching enum value minus one.
+TRUCK_IDLE = TruckStatus.IDLE.value - 1
+TRUCK_MINING = TruckStatus.MINING.value - 1
+TRUCK_UNLOADING = TruckStatus.UNLOADING.value - 1
+TRUCK_TRAVELING_TO_MINE = TruckStatus.TRAVELING_TO_MINE.value - 1
+TRUCK_TRAVELING_TO_STATION = TruckStatus.TRAVELING_TO_STATION.value - 1
+NUM_TRUCK_STATES = len(TruckStatus)
+STATION_IDLE = StationStatus.IDLE.value - 1
+STATION_BUSY = StationStatus.BUSY.value - 1
+NUM_STATION_STATES = len(StationStatus)
+
+# Enum member for each state code, for turning codes back into enums.
+TRUCK_STATUS_BY_CODE = tuple(TruckStatus)
+STATION_STATUS_BY_CODE = tuple(StationStatus)
+
+# Enum members used by the per slice methods, bound once so each use is one global lookup instead of two.
+_IDLE_TRUCK = TruckStatus.IDLE
+_MINING = TruckStatus.MINING
+_UNLOADING = TruckStatus.UNLOADING
+_TO_MINE = TruckStatus.TRAVELING_TO_MINE
+_TO_STATION = TruckStatus.TRAVELING_TO_STATION
+_IDLE_STATION = StationStatus.IDLE
+_BUSY = StationStatus.BUSY
+
+# Static text of the run summary, generate_report only fills in the numbers.
+RUN_REPORT_TEMPLATE = ('Results from simulated mining run.\n'
+                       '{run_hours} hour run {total_load_count} truck loads of ore delivered.\n'
+                       '{num_trucks} Trucks, {num_stations} Stations.\n'
+                       'Trucks operated at {truck_efficiency} percent efficiency, measured as hours'
+                       ' spent actively mining over the full run time.\n'
+                       'Stations operated at {station_efficiency} percent efficiency, measured as hours'
+                       ' spent actively unloading ore over the full run time.\n'
+                      )
+
 @dataclass
 class MiningRun:
   """ Tracking data for overall run of multiple stations and multiple trucks.
@@ -51,6 +98,23 @@ class MiningRun:
   min_mining_hours: int = 1
   max_mining_hours: int = 5
   slice_time: int = 5
+  inbound_travel_time: int = 30
+  outbound_travel_time: int = 30
+  unloading_time: int = 5
+  idle_wait_time: int = 5
+  # Set a seed to replay the same run, otherwise every run draws fresh random mining times.
+  seed: int | None = None
+  _rng: np.random.Generator | None = field(default=None, init=False, repr=False, compare=False)
+  # Mining times are drawn in bulk, then handed out one at a time by generate_mining_time.
+  _mining_pool: np.ndarray | None = field(default=None, init=False, repr=False, compare=False)
+  _mining_idx: int = field(default=0, init=False, repr=False, compare=False)
+  # Efficiency percentages, each kept with the totals it was worked out from, so changed totals are noticed.
+  _truck_efficiency: tuple[tuple, int] | None = field(default=None, init=False, repr=False, compare=False)
+  _station_efficiency: tuple[tuple, int] | None = field(default=None, init=False, repr=False, compare=False)
+  # Time series of activity counts, one row per slice, filled in by the simulation.
+  time_slice_report: np.ndarray | None = field(default=None, repr=False, compare=False)
+  # Stations free to accept a truck, in the order they became idle.
+  idle_stations: deque = field(default_factory=deque, repr=False, compare=False)
 
   def run_minutes(self) -> int:
     """ For human readable output.
@@ -63,40 +127,106 @@ class MiningRun:
     # ToDo: If the defined time parameters change, this constant will need to change.
     return self.run_hours * int(60/self.slice_time)
 
+  def timer_dtype(self) -> type:
+    """ Narrowest integer type for the truck countdown timers, in minutes.
+        A timer that is not a multiple of the slice time never lands on zero and keeps counting down,
+        so narrow timers are only used when every step time divides evenly into slices.
+    """
+    step_times = (self.max_mining_hours * 60, self.inbound_travel_time, self.outbound_travel_time,
+                  self.unloading_time, self.idle_wait_time)
+    if (self.slice_time > 0 and 60 % self.slice_time == 0
+        and all(0 <= step_time <= np.iinfo(np.int16).max and step_time % self.slice_time == 0
+                for step_time in step_times)):
+      return np.int16
+    return np.int32
+
+  def rng(self) -> np.random.Generator:
+    """ Random generator for the run. Created once, so every draw continues the same stream.
+    """
+    if self._rng is None:
+      self._rng = np.random.default_rng(self.seed)
+    return self._rng
+
+  def fill_mining_pool(self) -> np.ndarray:
+    """ Draw enough mining times for the whole run in one call, rather than one random call per mining trip.
+        Every truck can start at most one mining trip per hour, plus the initial one.
+    """
+    upper_bound = self.num_trucks * (self.run_hours + 1) or 1
+    self._mining_pool = self.rng().integers(
+        self.min_mining_hours, self.max_mining_hours + 1, size=upper_bound, dtype=np.int32) * 60
+    self._mining_idx = 0
+    return self._mining_pool
+
   # ToDo:  This might belong in the 'Truck' object.
   def generate_mining_time(self) -> int:
     """ Simulation specifies that mining will take between one and five hours.
     """
     # ToDo:  If Truck operating times are likely to change, this should be expanded.
-    return random.randint(self.min_mining_hours, self.max_mining_hours) * 60
+    mining_pool = self._mining_pool
+    if mining_pool is None or self._mining_idx >= len(mining_pool):
+      mining_pool = self.fill_mining_pool()
+    mining_time = mining_pool[self._mining_idx]
+    self._mining_idx += 1
+    return int(mining_time)
+
+  def generate_mining_times(self, count: int) -> np.ndarray:
+    """ Hand out the next count mining times at once, in the same order generate_mining_time would.
+    """
+    mining_times = np.empty(count, dtype=np.int32)
+    filled = 0
+    while filled < count:
+      mining_pool = self._mining_pool
+      if mining_pool is None or self._mining_idx >= len(mining_pool):
+        mining_pool = self.fill_mining_pool()
+      taken = mining_pool[self._mining_idx:self._mining_idx + count - filled]
+      mining_times[filled:filled + len(taken)] = taken
+      filled += len(taken)
+      self._mining_idx += len(taken)
+    return mining_times
 
   def generate_truck_efficiency(self) -> int:
     """ Calculate the percent of time a truck spends mining.
+        Reports ask for this repeatedly, so it is only calculated again when the totals change.
     """
-    average_busy_minutes_per_truck = self.total_busy_truck_time/self.num_trucks
-    average_ratio_of_busy_minutes = average_busy_minutes_per_truck/self.run_minutes()
-    percent_busy_time = round(100 * average_ratio_of_busy_minutes)
-    return percent_busy_time
+    totals = (self.total_busy_truck_time, self.num_trucks, self.run_hours)
+    if self._truck_efficiency is None or self._truck_efficiency[0] != totals:
+      if not self.num_trucks or not self.run_hours:
+        # Nothing ran, so nothing was busy. (And avoid dividing by zero.)
+        truck_efficiency = 0
+      else:
+        average_busy_minutes_per_truck = self.total_busy_truck_time/self.num_trucks
+        average_ratio_of_busy_minutes = average_busy_minutes_per_truck/self.run_minutes()
+        truck_efficiency = round(100 * average_ratio_of_busy_minutes)
+      self._truck_efficiency = (totals, truck_efficiency)
+    return self._truck_efficiency[1]
 
   def generate_station_efficiency(self) -> int:
     """ Calculate the percent of time a station spends unloading.
+        Reports ask for this repeatedly, so it is only calculated again when the totals change.
     """
-    average_busy_minutes_per_station = self.total_busy_station_time/self.num_stations
-    average_ratio_of_busy_minutes = average_busy_minutes_per_station/self.run_minutes()
-    percent_busy_time = round(100 * average_ratio_of_busy_minutes)
-    return percent_busy_time
+    totals = (self.total_busy_station_time, self.num_stations, self.run_hours)
+    if self._station_efficiency is None or self._station_efficiency[0] != totals:
+      if not self.num_stations or not self.run_hours:
+        # Nothing ran, so nothing was busy. (And avoid dividing by zero.)
+        station_efficiency = 0
+      else:
+        average_busy_minutes_per_station = self.total_busy_station_time/self.num_stations
+        average_ratio_of_busy_minutes = average_busy_minutes_per_station/self.run_minutes()
+        station_efficiency = round(100 * average_ratio_of_busy_minutes)
+      self._station_efficiency = (totals, station_efficiency)
+    return self._station_efficiency[1]
 
   def generate_report(self) -> str:
     """ Returns a formatted string with summary information from the full test run.
     """
-    return ('Results from simulated mining run.\n'
-            f'{self.run_hours} hour run {self.total_load_count} truck loads of ore delivered.\n'
-            f'{self.num_trucks} Trucks, {self.num_stations} Stations.\n'
-            f'Trucks operated at {self.generate_truck_efficiency()} percent efficiency, measured as hours'
-             ' spent actively mining over the full run time.\n'
-            f'Stations operated at {self.generate_station_efficiency()} percent efficiency, measured as hours'
-             ' spent actively unloading ore over the full run time.\n'
-           )
+    return RUN_REPORT_TEMPLATE.format_map({
+        'run_hours': self.run_hours,
+        'total_load_count': self.total_load_count,
+        'num_trucks': self.num_trucks,
+        'num_stations': self.num_stations,
+        'truck_efficiency': self.generate_truck_efficiency(),
+        'station_efficiency': self.generate_station_efficiency(),
+    })
 
   def generate_csv_report(self) -> str:
     """ Returns a comma separated string for storing in files.
@@ -114,133 +244,156 @@ class Truck():
   """
   # pylint: disable=too-many-instance-attributes
   # Truck is they core functional component of this project, so is somewhat complex.
+  # Fixed attribute set, so no per instance __dict__. The annotations below are type hints only.
+  __slots__ = ('state', 'name', 'time_in_state', 'completed_loads', 'current_cycle_mining_time', 'verbose',
+               'simulation_parameters', 'remaining_time', '_slice_time', '_inbound', '_outbound', '_unload',
+               '_idle_wait', '_idle_stations')
   state: TruckStatus
   name: str
-  time_logs: dict
+  time_in_state: list[int]
   completed_loads: int
-  current_mining_time: int
+  current_cycle_mining_time: int
   verbose: bool
-  run_parameters: MiningRun
+  simulation_parameters: MiningRun
+  remaining_time: int
 
-  def __init__(self, simulation_parameters, name='unnamed'):
+  def __init__(self, simulation_parameters, name='unnamed', mining_time=None):
+    """ mining_time is the length of the first mining trip, drawn from the run when not given.
+    """
     self.name = name
-    # ToDo: Replace 'time_logs' dict with regular object attributes.
-    self.time_logs: dict = {t.name: 0 for t in TruckStatus}
+    # Minutes spent in each state, indexed by state code. (TruckStatus value minus one.)
+    self.time_in_state = [0] * NUM_TRUCK_STATES
     # Per simulation specification, trucks start at the mining site.
-    self.state = TruckStatus.MINING
+    self.state = _MINING
     self.completed_loads = 0
 
     self.simulation_parameters = simulation_parameters
     # ToDo:  These two could probably use simulation_parameters directly.
     self.verbose = simulation_parameters.verbose_trucks
-    self.remaining_time = self.simulation_parameters.generate_mining_time()
+    self.remaining_time = (self.simulation_parameters.generate_mining_time() if mining_time is None
+                           else mining_time)
 
     self.current_cycle_mining_time = self.remaining_time
 
+    # Run parameters are fixed for the run, keep local copies so each slice skips the double attribute lookup.
+    self._slice_time = simulation_parameters.slice_time
+    self._inbound = simulation_parameters.inbound_travel_time
+    self._outbound = simulation_parameters.outbound_travel_time
+    self._unload = simulation_parameters.unloading_time
+    self._idle_wait = simulation_parameters.idle_wait_time
+    self._idle_stations = simulation_parameters.idle_stations
+
   def __str__(self):
     return (f'Truck Name: {self.name}\nTruck State: {self.state.name}\nRemaining time in state: {self.remaining_time}'
-            f' Completed_Loads: {self.completed_loads}\nTotal Time in state: {self.time_logs}')
+            f' Completed_Loads: {self.completed_loads}\nTotal Time in state: '
+            + ' '.join(f'{status.name}:{self.time_in_state[status.value - 1]}' for status in TruckStatus))
 
   def get_available_station(self, stations: list['Station']):
-    """ Check station status and return the first available station, or none if all stations are busy.
+    """ Take the longest idle station off the idle queue, or return none if all stations are busy.
+        The station list is only walked for verbose output.
     """
-    for station in stations:
-      if station.state == StationStatus.BUSY:
-        if self.verbose:
-          print(f'Station {station.name} is busy, servicing {station.attached_truck.name}')
-      else:
+    if self.verbose:
+      for station in stations:
+        if station.state == _BUSY:
+          log.debug('Station %s is busy, servicing %s', station.name, station.attached_truck.name)
+    idle_stations = self._idle_stations
+    while idle_stations:
+      station = idle_stations.popleft()
+      # A station attached directly, rather than through this queue, may still be queued. Skip it.
+      if station.state != _BUSY:
         if self.verbose:
-          print(f'Station {station.name} is idle, attaching {self.name}')
+          log.debug('Station %s is idle, attaching %s', station.name, self.name)
         return station
     if self.verbose:
-      print('No available stations')
+      log.debug('No available stations')
     return None
 
-  def transition_from_mining(self):
+  def transition_from_mining(self, _stations: list['Station'] | None = None):
     """ When a truck is full, begin moving it to the stations.
     """
-    self.time_logs['MINING'] += self.current_cycle_mining_time
-    self.state = TruckStatus.TRAVELING_TO_STATION
-    self.remaining_time = self.simulation_parameters.inbound_travel_time
+    self.time_in_state[TRUCK_MINING] += self.current_cycle_mining_time
+    self.state = _TO_STATION
+    self.remaining_time = self._inbound
 
-  def transition_from_inbound(self, stations: list['Station']):
+  def transition_from_inbound(self, stations: list['Station']) -> 'Station | None':
     """
         When a truck arrives at the stations, assign to an available station.
         If no stations are available, set truck to idle.
+        Returns the station the truck attached to, if any.
     """
-    self.time_logs['TRAVELING_TO_STATION'] += self.simulation_parameters.inbound_travel_time
+    self.time_in_state[TRUCK_TRAVELING_TO_STATION] += self._inbound
     if station := self.get_available_station(stations):
       if self.verbose:
-        print(f'Attaching {self.name} to {station.name}')
+        log.debug('Attaching %s to %s', self.name, station.name)
       station.attach(self)
-      self.state = TruckStatus.UNLOADING
-      self.remaining_time = self.simulation_parameters.unloading_time
+      self.state = _UNLOADING
+      self.remaining_time = self._unload
     else:
       if self.verbose:
-        print('No station available for {self.name} switching to idle state and waiting five minutes')
-      self.state = TruckStatus.IDLE
-      self.remaining_time = self.simulation_parameters.idle_wait_time
+        log.debug('No station available for %s switching to idle state and waiting five minutes', self.name)
+      self.state = _IDLE_TRUCK
+      self.remaining_time = self._idle_wait
+    return station
 
-  def transition_from_unloading(self):
+  def transition_from_unloading(self, _stations: list['Station'] | None = None):
     """ When a truck is empty, send it back to the mining site. 
     """
-    self.time_logs['UNLOADING'] += self.simulation_parameters.unloading_time
+    self.time_in_state[TRUCK_UNLOADING] += self._unload
     self.completed_loads += 1
-    self.state = TruckStatus.TRAVELING_TO_MINE
-    self.remaining_time = self.simulation_parameters.outbound_travel_time
+    self.state = _TO_MINE
+    self.remaining_time = self._outbound
 
-  def transition_from_idle(self, stations: list['Station']):
+  def transition_from_idle(self, stations: list['Station']) -> 'Station | None':
     """ When a truck has been idling, assign to an available station.
         If no stations are available, reset the idle time
     """
-    self.time_logs['IDLE'] += self.simulation_parameters.idle_wait_time
+    self.time_in_state[TRUCK_IDLE] += self._idle_wait
     # Transition From Inbound and Transition from Idle are the same activity.
-    self.transition_from_inbound(stations)
+    return self.transition_from_inbound(stations)
 
-  def transition_from_outbound(self):
+  def transition_from_outbound(self, _stations: list['Station'] | None = None):
     """ When a truck arrives at the mining site, determine how long it needs to stay.
         Then set time and state.
     """
-    self.time_logs['TRAVELING_TO_MINE'] += self.simulation_parameters.outbound_travel_time
-    self.state = TruckStatus.MINING
+    self.time_in_state[TRUCK_TRAVELING_TO_MINE] += self._outbound
+    self.state = _MINING
     self.remaining_time = self.simulation_parameters.generate_mining_time()
     self.current_cycle_mining_time = self.remaining_time
 
-  def cycle(self, stations: list['Station']):
+  def cycle(self, stations: list['Station']) -> 'Station | None':
     """
         Move time forward by one five minute slice. 
         If the truck has remaining time of zero, transition it to it's next state.
+        Returns the station the truck attached to, if it started unloading.
     """
     # This could be written as "> 0" but that is slightly more computationally intensive.
     if self.remaining_time:
       if self.verbose:
-        print(f'{self.name} Stay in state {self.state.name} for {self.remaining_time} minutes')
-      self.remaining_time -= self.simulation_parameters.slice_time
-    else:
-      match self.state:
-        case TruckStatus.MINING:
-          self.transition_from_mining()
-
-        case TruckStatus.TRAVELING_TO_STATION:
-          self.transition_from_inbound(stations)
-
-        case TruckStatus.UNLOADING:
-          self.transition_from_unloading()
-
-        case TruckStatus.IDLE:
-          self.transition_from_idle(stations)
+        log.debug('%s Stay in state %s for %s minutes', self.name, self.state.name, self.remaining_time)
+      self.remaining_time -= self._slice_time
+      return None
+    return self.transition(stations)
+
+  def transition(self, stations: list['Station']) -> 'Station | None':
+    """ The time in the current state is up, move the truck on to its next state.
+        Returns the station the truck attached to, if it started unloading.
+    """
+    return self._handlers[self.state - 1](self, stations)
 
-        case TruckStatus.TRAVELING_TO_MINE:
-          self.transition_from_outbound()
+  # Transition to run when the time in each state is up, indexed by state code. (TruckStatus value minus one.)
+  # A table lookup replaces walking through a match statement every slice.
+  _handlers = (transition_from_idle, transition_from_mining, transition_from_unloading, transition_from_outbound,
+               transition_from_inbound)
 
   def generate_report(self) -> str:
     """Deliver a self status report.
     """
-    ratio_of_time_mining = self.time_logs['MINING'] / self.simulation_parameters.run_minutes()
+    ratio_of_time_mining = self.time_in_state[TRUCK_MINING] / self.simulation_parameters.run_minutes()
     percent_of_time_mining = round(ratio_of_time_mining * 100)
 
     return (f'Status report for truck: {self.name}\n'
-            f'Time spent mining. Total: {round(self.time_logs["MINING"]/60)} hours. Percent: {percent_of_time_mining}\n'
+            f'Time spent mining. Total: {round(self.time_in_state[TRUCK_MINING]/60)} hours.'
+            f' Percent: {percent_of_time_mining}\n'
             f'Loads of Ore delivered: {self.completed_loads}\n')
 
 
@@ -251,25 +404,32 @@ class Station():
       Idle stations can accept ore from a truck, busy stations cannot.
       Busy stations transition to idle after an unloading period. (initially five minutes)
   """
+  # Fixed attribute set, so no per instance __dict__. The annotations below are type hints only.
+  __slots__ = ('state', 'name', 'busy_minutes', 'idle_minutes', 'attached_truck', 'verbose', 'completed_loads',
+               'simulation_parameters', '_slice_time', '_idle_stations')
   state: StationStatus
   name: str
-  busy_minutes: int = 0
-  idle_minutes: int = 0
+  busy_minutes: int
+  idle_minutes: int
   attached_truck: Truck | None
   verbose: bool
   completed_loads: int
-  run_parameters: MiningRun
+  simulation_parameters: MiningRun
 
   def __init__(self, simulation_parameters, name='unnamed', verbose=False):
     self.name = name
     self.busy_minutes = 0
     self.idle_minutes = 0
-    self.state = StationStatus.IDLE
+    self.state = _IDLE_STATION
     self.attached_truck = None
     # ToDo: Use simulation_parameters directly instead of a separate parameter.
     self.verbose = verbose
     self.simulation_parameters = simulation_parameters
     self.completed_loads = 0
+    # Run parameters are fixed for the run, keep local copies so each slice skips the double attribute lookup.
+    self._slice_time = simulation_parameters.slice_time
+    self._idle_stations = simulation_parameters.idle_stations
+    self._idle_stations.append(self)
 
   def __str__(self):
     msg = ( f'Station Name: {self.name}\n'
@@ -283,27 +443,28 @@ class Station():
     """ Attach a truck to a station.
     """
     if self.verbose:
-      print(f'Attaching {truck.name} to {self.name}')
+      log.debug('Attaching %s to %s', truck.name, self.name)
     self.attached_truck = truck
-    self.state = StationStatus.BUSY
+    self.state = _BUSY
 
   def release(self):
     """ Release an attached truck.
     """
     if self.verbose:
-      print(f'Releaseing {self.attached_truck.name} from {self.name}')
-    self.state = StationStatus.IDLE
+      log.debug('Releasing %s from %s', self.attached_truck.name, self.name)
+    self.state = _IDLE_STATION
     self.completed_loads += 1
     self.attached_truck = None
+    self._idle_stations.append(self)
 
   def cycle(self):
     """ Move Busy stations to idle, or record idle time.
     """
-    if self.state == StationStatus.BUSY:
-      self.busy_minutes += self.simulation_parameters.slice_time
+    if self.state == _BUSY:
+      self.busy_minutes += self._slice_time
       self.release()
     else:
-      self.idle_minutes += self.simulation_parameters.slice_time
+      self.idle_minutes += self._slice_time
 
   def generate_report(self) -> str:
     """Deliver a self status report.
@@ -315,3 +476,171 @@ class Station():
             f'Time spent unloading. Total: {round(self.busy_minutes/60)} hours.'
             f' Percent: {percent_of_time_unloading}\n'
             f'Loads of Ore unloaded: {self.completed_loads}\n')
+
+
+@dataclass
+class TruckArray:
+  """ A fleet of trucks held as parallel arrays, one entry per truck, so step_trucks can move them all at once.
+      States are integer state codes. Built from, and copied back to, Truck objects.
+  """
+  state: np.ndarray
+  remaining_time: np.ndarray
+  current_cycle_mining_time: np.ndarray
+  completed_loads: np.ndarray
+  # Minutes spent in each state, one row per truck.
+  time_in_state: np.ndarray
+  # Number of trucks in each state. Kept up to date by step_trucks from the transitions alone.
+  state_counts: np.ndarray = field(init=False)
+
+  def __post_init__(self):
+    self.state_counts = np.bincount(self.state, minlength=NUM_TRUCK_STATES)
+
+  @classmethod
+  def from_trucks(cls, trucks: list[Truck], timer_dtype: type = np.int32) -> 'TruckArray':
+    """ Gather the state of each truck into arrays.
+        The timers may be narrowed with timer_dtype, see MiningRun.timer_dtype. Totals stay int32.
+    """
+    return cls(
+        state=np.array([truck.state - 1 for truck in trucks], dtype=np.int8),
+        remaining_time=np.array([truck.remaining_time for truck in trucks], dtype=timer_dtype),
+        current_cycle_mining_time=np.array([truck.current_cycle_mining_time for truck in trucks], dtype=timer_dtype),
+        completed_loads=np.array([truck.completed_loads for truck in trucks], dtype=np.int32),
+        time_in_state=np.array([truck.time_in_state for truck in trucks], dtype=np.int32).reshape(
+            -1, NUM_TRUCK_STATES))
+
+  def to_trucks(self, trucks: list[Truck]):
+    """ Copy the array state back onto the truck objects.
+    """
+    for truck, state, remaining_time, mining_time, completed_loads, time_in_state in zip(
+        trucks, self.state.tolist(), self.remaining_time.tolist(), self.current_cycle_mining_time.tolist(),
+        self.completed_loads.tolist(), self.time_in_state.tolist()):
+      truck.state = TRUCK_STATUS_BY_CODE[state]
+      truck.remaining_time = remaining_time
+      truck.current_cycle_mining_time = mining_time
+      truck.completed_loads = completed_loads
+      truck.time_in_state = time_in_state
+
+
+@dataclass
+class StationArray:
+  """ A set of stations held as parallel arrays, one entry per station, so step_stations can move them all at once.
+      States are integer state codes, and trucks and stations are referred to by their position in the list.
+  """
+  state: np.ndarray
+  # Number of the truck being unloaded, or -1 when none is.
+  attached_truck: np.ndarray
+  busy_minutes: np.ndarray
+  idle_minutes: np.ndarray
+  completed_loads: np.ndarray
+  # Stations free to accept a truck, in the order they became idle. Same rules as MiningRun.idle_stations.
+  idle_queue: deque = field(default_factory=deque)
+  # Number of stations in each state. Kept up to date by step_stations and step_trucks.
+  state_counts: np.ndarray = field(init=False)
+
+  def __post_init__(self):
+    self.state_counts = np.bincount(self.state, minlength=NUM_STATION_STATES)
+
+  @classmethod
+  def from_stations(cls, stations: list[Station], trucks: list[Truck], idle_stations: deque) -> 'StationArray':
+    """ Gather the state of each station into arrays.
+    """
+    truck_numbers = {truck: truck_num for truck_num, truck in enumerate(trucks)}
+    station_numbers = {station: station_num for station_num, station in enumerate(stations)}
+    return cls(
+        state=np.array([station.state - 1 for station in stations], dtype=np.int8),
+        attached_truck=np.array([truck_numbers[station.attached_truck] if station.attached_truck else -1
+                                 for station in stations], dtype=np.int32),
+        busy_minutes=np.array([station.busy_minutes for station in stations], dtype=np.int32),
+        idle_minutes=np.array([station.idle_minutes for station in stations], dtype=np.int32),
+        completed_loads=np.array([station.completed_loads for station in stations], dtype=np.int32),
+        idle_queue=deque(station_numbers[station] for station in idle_stations))
+
+  def to_stations(self, stations: list[Station], trucks: list[Truck], idle_stations: deque):
+    """ Copy the array state back onto the station objects, and the idle queue back onto the run.
+    """
+    for station, state, attached_truck, busy_minutes, idle_minutes, completed_loads in zip(
+        stations, self.state.tolist(), self.attached_truck.tolist(), self.busy_minutes.tolist(),
+        self.idle_minutes.tolist(), self.completed_loads.tolist()):
+      station.state = STATION_STATUS_BY_CODE[state]
+      station.attached_truck = trucks[attached_truck] if attached_truck >= 0 else None
+      station.busy_minutes = busy_minutes
+      station.idle_minutes = idle_minutes
+      station.completed_loads = completed_loads
+    idle_stations.clear()
+    idle_stations.extend(stations[station_num] for station_num in self.idle_queue)
+
+  def take_idle(self, count: int) -> np.ndarray:
+    """ Take up to count of the longest idle stations off the idle queue.
+    """
+    taken: list[int] = []
+    idle_queue = self.idle_queue
+    while idle_queue and len(taken) < count:
+      station_num = idle_queue.popleft()
+      # Like Truck.get_available_station, skip stations that were attached without going through the queue.
+      if self.state[station_num] != STATION_BUSY:
+        taken.append(station_num)
+    return np.array(taken, dtype=np.intp)
+
+
+def step_stations(station_array: StationArray, slice_time: int):
+  """ Move every station forward one slice, the same as Station.cycle.
+      Busy stations are released and rejoin the idle queue in station order.
+  """
+  is_busy = station_array.state == STATION_BUSY
+  busy = np.flatnonzero(is_busy)
+  station_array.busy_minutes[busy] += slice_time
+  station_array.idle_minutes[~is_busy] += slice_time
+  station_array.state[busy] = STATION_IDLE
+  station_array.attached_truck[busy] = -1
+  station_array.completed_loads[busy] += 1
+  station_array.idle_queue.extend(busy.tolist())
+  station_array.state_counts[STATION_BUSY] -= len(busy)
+  station_array.state_counts[STATION_IDLE] += len(busy)
+
+def step_trucks(truck_array: TruckArray, station_array: StationArray, simulation_parameters: MiningRun):
+  """ Move every truck forward one slice, the same as Truck.cycle.
+      Trucks whose time is up transition, grouped by state. Arriving trucks get stations in fleet order,
+      and mining times are handed out in fleet order, so the results match cycling each truck in turn.
+  """
+  state = truck_array.state
+  remaining_time = truck_array.remaining_time
+  time_in_state = truck_array.time_in_state
+  due = np.flatnonzero(remaining_time == 0)
+  remaining_time -= simulation_parameters.slice_time
+  due_state = state[due]
+
+  mining = due[due_state == TRUCK_MINING]
+  time_in_state[mining, TRUCK_MINING] += truck_array.current_cycle_mining_time[mining]
+  state[mining] = TRUCK_TRAVELING_TO_STATION
+  remaining_time[mining] = simulation_parameters.inbound_travel_time
+
+  unloading = due[due_state == TRUCK_UNLOADING]
+  time_in_state[unloading, TRUCK_UNLOADING] += simulation_parameters.unloading_time
+  truck_array.completed_loads[unloading] += 1
+  state[unloading] = TRUCK_TRAVELING_TO_MINE
+  remaining_time[unloading] = simulation_parameters.outbound_travel_time
+
+  outbound = due[due_state == TRUCK_TRAVELING_TO_MINE]
+  time_in_state[outbound, TRUCK_TRAVELING_TO_MINE] += simulation_parameters.outbound_travel_time
+  state[outbound] = TRUCK_MINING
+  remaining_time[outbound] = truck_array.current_cycle_mining_time[outbound] = (
+      simulation_parameters.generate_mining_times(len(outbound)))
+
+  # Arriving from travel and retrying from idle are the same activity.
+  time_in_state[due[due_state == TRUCK_IDLE], TRUCK_IDLE] += simulation_parameters.idle_wait_time
+  arriving = due[(due_state == TRUCK_TRAVELING_TO_STATION) | (due_state == TRUCK_IDLE)]
+  time_in_state[arriving, TRUCK_TRAVELING_TO_STATION] += simulation_parameters.inbound_travel_time
+  stations = station_array.take_idle(len(arriving))
+  attaching, waiting = arriving[:len(stations)], arriving[len(stations):]
+  station_array.state[stations] = STATION_BUSY
+  station_array.attached_truck[stations] = attaching
+  state[attaching] = TRUCK_UNLOADING
+  remaining_time[attaching] = simulation_parameters.unloading_time
+  state[waiting] = TRUCK_IDLE
+  remaining_time[waiting] = simulation_parameters.idle_wait_time
+  station_array.state_counts[STATION_BUSY] += len(stations)
+  station_array.state_counts[STATION_IDLE] -= len(stations)
+
+  # Only the trucks that transitioned change the state counts.
+  truck_array.state_counts += (np.bincount(state[due], minlength=NUM_TRUCK_STATES)
+                               - np.bincount(due_state, minlength=NUM_TRUCK_STATES))
@@ -4,6 +4,7 @@ No Mocks, or Magic, or fancy assert types. Only the most simple.
 """
 # pylint: disable=missing-function-docstring,invalid-name
 
+import numpy as np
 import components
 
 def test_TruckStatus():
@@ -26,6 +27,16 @@ def test_MiningRun_mining_time():
   run = components.MiningRun()
   assert 60 <= run.generate_mining_time() <= 300
 
+def test_MiningRun_mining_time_refills_pool():
+  run = components.MiningRun(num_trucks=2, run_hours=3, min_mining_hours=2, max_mining_hours=3)
+  mining_times = [run.generate_mining_time() for _ in range(20)]
+  assert all(mining_time in (120, 180) for mining_time in mining_times)
+
+def test_MiningRun_mining_time_seeded():
+  first_run = components.MiningRun(num_trucks=3, run_hours=2, seed=7)
+  second_run = components.MiningRun(num_trucks=3, run_hours=2, seed=7)
+  assert [first_run.generate_mining_time() for _ in range(30)] == [second_run.generate_mining_time() for _ in range(30)]
+
 def test_MiningRun_truck_efficency():
   run = components.MiningRun(
             num_trucks=1,
@@ -34,6 +45,16 @@ def test_MiningRun_truck_efficency():
         )
   assert run.generate_truck_efficiency() == 100
 
+def test_MiningRun_truck_efficency_follows_totals():
+  run = components.MiningRun(
+            num_trucks=2,
+            run_hours=1,
+            total_busy_truck_time=60,
+        )
+  assert run.generate_truck_efficiency() == 50
+  run.total_busy_truck_time = 120
+  assert run.generate_truck_efficiency() == 100
+
 def test_MiningRun_station_efficency():
   run = components.MiningRun(
             num_stations=1,
@@ -42,6 +63,11 @@ def test_MiningRun_station_efficency():
         )
   assert run.generate_station_efficiency() == 100
 
+def test_MiningRun_efficency_empty_run():
+  run = components.MiningRun()
+  assert run.generate_truck_efficiency() == 0
+  assert run.generate_station_efficiency() == 0
+
 def test_MiningRun_generate_report():
   run = components.MiningRun(
             num_stations=1,
@@ -81,8 +107,7 @@ def test_Truck_print():
   expected = ['Truck Name: unnamed',
               'Truck State: MINING',
               'Remaining time in state: 60 Completed_Loads: 0', # Will not be used, value has a random number in it.
-              "Total Time in state: {'IDLE': 0, 'MINING': 0, 'UNLOADING': 0, 'TRAVELING_TO_MINE': 0,"
-              " 'TRAVELING_TO_STATION': 0}"
+              'Total Time in state: IDLE:0 MINING:0 UNLOADING:0 TRAVELING_TO_MINE:0 TRAVELING_TO_STATION:0'
              ]
   assert f'{truck}'.split('\n', maxsplit=1)[0] == expected[0]
   assert f'{truck}'.split('\n')[1] == expected[1]
@@ -108,6 +133,19 @@ def test_Truck_get_available_stations_not_available():
 
   assert truck.get_available_station(stations) is None
 
+def test_Truck_get_available_stations_uses_idle_queue():
+  run = components.MiningRun()
+  truck = components.Truck(run)
+  first_station = components.Station(run)
+  second_station = components.Station(run)
+  stations = [first_station, second_station]
+
+  assert truck.get_available_station(stations) == first_station
+  first_station.attach(truck)
+  first_station.release()
+  # The released station goes to the back of the queue.
+  assert list(run.idle_stations) == [second_station, first_station]
+
 def test_Truck_transition_from_mining():
   run = components.MiningRun()
   run.inbound_travel_time = 11
@@ -160,13 +198,21 @@ def test_Truck_transition_from_unloading():
   assert truck.state == components.TruckStatus.TRAVELING_TO_MINE
   assert truck.remaining_time == 13
 
-# Not writing unit test for Truck.cycle.
-# All it is is a match/case statement that redirects to other functions that are unit tested.
+def test_Truck_handlers_match_state_codes():
+  handlers = components.Truck._handlers  # pylint: disable=protected-access
+  assert handlers[components.TRUCK_IDLE] is components.Truck.transition_from_idle
+  assert handlers[components.TRUCK_MINING] is components.Truck.transition_from_mining
+  assert handlers[components.TRUCK_UNLOADING] is components.Truck.transition_from_unloading
+  assert handlers[components.TRUCK_TRAVELING_TO_MINE] is components.Truck.transition_from_outbound
+  assert handlers[components.TRUCK_TRAVELING_TO_STATION] is components.Truck.transition_from_inbound
+
+# Not writing further unit tests for Truck.cycle.
+# All it does is look up and call other functions that are unit tested.
 
 def test_Truck_generate_report():
   run = components.MiningRun(run_hours=1)
   truck = components.Truck(run)
-  truck.time_logs['MINING'] = 60
+  truck.time_in_state[components.TRUCK_MINING] = 60
 
   expected = ('Status report for truck: unnamed\n'
               'Time spent mining. Total: 1 hours. Percent: 100\n'
@@ -174,6 +220,11 @@ def test_Truck_generate_report():
              )
   assert truck.generate_report() == expected
 
+def test_Truck_and_Station_have_no_instance_dict():
+  run = components.MiningRun()
+  assert not hasattr(components.Truck(run), '__dict__')
+  assert not hasattr(components.Station(run), '__dict__')
+
 def test_Station():
   run = components.MiningRun()
   station = components.Station(run)
@@ -229,3 +280,62 @@ def test_Station_cycle_from_idle():
 
   station.cycle()
   assert station.state == components.StationStatus.IDLE
+
+def test_MiningRun_mining_times_match_mining_time():
+  first_run = components.MiningRun(num_trucks=2, run_hours=2, seed=5)
+  second_run = components.MiningRun(num_trucks=2, run_hours=2, seed=5)
+  # Enough to refill the pool a few times.
+  expected = [first_run.generate_mining_time() for _ in range(20)]
+  detected = list(second_run.generate_mining_times(7)) + list(second_run.generate_mining_times(13))
+  assert detected == expected
+
+def test_MiningRun_timer_dtype():
+  assert components.MiningRun().timer_dtype() == np.int16
+  # Longer than int16 holds, or a step that never counts down to zero, keeps the wide timers.
+  assert components.MiningRun(min_mining_hours=600, max_mining_hours=600).timer_dtype() == np.int32
+  assert components.MiningRun(inbound_travel_time=7).timer_dtype() == np.int32
+
+def test_TruckArray_round_trip():
+  run = components.MiningRun()
+  truck = components.Truck(run)
+  truck.state = components.TruckStatus.UNLOADING
+  truck.completed_loads = 3
+  truck.time_in_state[components.TRUCK_IDLE] = 10
+  components.TruckArray.from_trucks([truck]).to_trucks([truck])
+  assert truck.state == components.TruckStatus.UNLOADING
+  assert truck.completed_loads == 3
+  assert truck.time_in_state == [10, 0, 0, 0, 0]
+
+def test_StationArray_take_idle():
+  run = components.MiningRun()
+  stations = [components.Station(run) for _ in range(3)]
+  stations[0].state = components.StationStatus.BUSY
+  station_array = components.StationArray.from_stations(stations, [], run.idle_stations)
+  # The busy station is skipped, the rest come out in queue order.
+  assert list(station_array.take_idle(5)) == [1, 2]
+  assert not station_array.idle_queue
+
+def test_step_trucks_matches_Truck_cycle():
+  # Fixed mining time, and one station for three trucks so some have to wait.
+  object_run = components.MiningRun(num_trucks=3, num_stations=1, run_hours=10, min_mining_hours=1,
+                                    max_mining_hours=1)
+  array_run = components.MiningRun(num_trucks=3, num_stations=1, run_hours=10, min_mining_hours=1,
+                                   max_mining_hours=1)
+  trucks = [components.Truck(object_run) for _ in range(3)]
+  stations = [components.Station(object_run)]
+  truck_array = components.TruckArray.from_trucks([components.Truck(array_run) for _ in range(3)])
+  station_array = components.StationArray.from_stations([components.Station(array_run)], [],
+                                                        array_run.idle_stations)
+  for _ in range(array_run.run_time_slices()):
+    for station in stations:
+      station.cycle()
+    for truck in trucks:
+      truck.cycle(stations)
+    components.step_stations(station_array, array_run.slice_time)
+    components.step_trucks(truck_array, station_array, array_run)
+    assert [truck.state - 1 for truck in trucks] == list(truck_array.state)
+    assert list(truck_array.state_counts) == list(np.bincount(truck_array.state, minlength=5))
+    assert list(station_array.state_counts) == list(np.bincount(station_array.state, minlength=2))
+  assert [truck.time_in_state for truck in trucks] == truck_array.time_in_state.tolist()
+  assert [truck.completed_loads for truck in trucks] == list(truck_array.completed_loads)
+  assert [station.busy_minutes for station in stations] == list(station_array.busy_minutes)
@@ -6,16 +6,23 @@ I think if I started adding ToDo comments here it would end up 60% by weight.
 """
 
 import base64
+import functools
+import threading
 from io import BytesIO
 from dataclasses import dataclass
 from flask import Flask, request, render_template, url_for, flash, redirect
+import matplotlib
 from matplotlib.figure import Figure
-import pandas
 import numpy as np
 from components import MiningRun, TruckStatus
 from simulate import simulation
 
+# Render straight to png, no GUI backend needed.
+matplotlib.use('Agg')
+
 app = Flask(__name__)
+# Plots share one figure, only one request may draw on it at a time.
+plot_lock = threading.Lock()
 app.config['SECRET_KEY'] = '502B3992-78AF-4936-A185-92A8F579D8E3'
 
 
@@ -24,7 +31,7 @@ class RunReport(MiningRun):
   """ Set the parameters for a mining run, including defaults.
   """
   # pylint: disable=too-many-instance-attributes
-  pd_data: pandas.DataFrame | None = None
+  plot_data: np.ndarray | None = None
   idle_wait_time = 5
   inbound_travel_time = 30
   outbound_travel_time = 30
@@ -35,8 +42,11 @@ class RunReport(MiningRun):
   truck_components = ['MINING', 'TRAVELING_TO_STATION', 'IDLE', 'UNLOADING', 'TRAVELING_TO_MINE']
   station_components = ['BUSY', 'IDLE.1']
   base_components = truck_components + station_components
+  # Column of each component in plot_data.
+  component_columns = dict(zip(base_components, range(len(base_components))))
 
   def __init__(self, request):
+    super().__init__()
     self.num_trucks = int(request.form['num_trucks'])
     self.num_stations = int(request.form['num_stations'])
     self.run_hours = int(request.form['run_hours'])
@@ -47,30 +57,49 @@ class RunReport(MiningRun):
     self.inbound_travel_time = int(request.form['transit_time'])
     self.outbound_travel_time = int(request.form['transit_time'])
     self.report_as_percent = bool('report_as_percent' in request.form)
-    self.columns_to_exclude = []
+    checked_boxes = request.form.getlist('included_columns')
+    self.columns_to_exclude = [column for column in self.base_components if column not in checked_boxes]
+    # Columns each plot shows, worked out once here rather than on every plot.
+    self.truck_plot_columns = sorted(set(self.truck_components) - set(self.columns_to_exclude))
+    self.station_plot_columns = sorted(set(self.station_components) - set(self.columns_to_exclude))
 
-def populate_pandas_dataframe(run):
-  """ Initialize and populate the pandas dataframe. Calculate percentates.
+def populate_plot_data(run):
+  """ Copy the simulation's time series into a plain integer array, one row per slice. Calculate percentages.
   """
-  # pylint: disable=no-member
-  run.pd_data = pandas.read_csv('mining_report.csv', sep=',', header=3, index_col=0)
+  # The first column of the time series is the slice count.
+  # Counts never exceed the number of devices, so use the narrowest type that holds that. (uint16 for 1000 trucks.)
+  count_type = np.min_scalar_type(max(run.num_trucks, run.num_stations))
+  run.plot_data = run.time_slice_report[:, 1:].astype(count_type)
   if run.report_as_percent:
-    for component in run.truck_components:
-      run.pd_data[component] = round(100*(run.pd_data[component] / run.num_trucks))
-    for component in run.station_components:
-       run.pd_data[component] = round(100*(run.pd_data[component] / run.num_stations))
-  if run.columns_to_exclude:
-    run.pd_data = run.pd_data.drop(columns=run.columns_to_exclude)
-  run.pd_data.style.format(precision=0)
+    # Percentages run 0 to 100, so uint8 is enough. With no devices of a kind, its counts are all zero already.
+    percent_data = np.zeros(run.plot_data.shape, np.uint8)
+    for components, device_count in ((run.truck_components, run.num_trucks),
+                                     (run.station_components, run.num_stations)):
+      if device_count:
+        columns = [run.component_columns[component] for component in components]
+        percent_data[:, columns] = np.round(100 * (run.plot_data[:, columns] / device_count))
+    run.plot_data = percent_data
 
-def get_plot(run, components, name):
-  """ Generate the chart/plot as a png.
+@functools.cache
+def plot_figure() -> Figure:
+  """ Build the figure once. Clearing and redrawing its axes is much cheaper than a new Figure per plot.
   """
-  # pylint: disable=no-member
   fig = Figure()
-  ax = fig.subplots()
-  components = sorted(list(set(components) - set(run.columns_to_exclude)))
-  ax.plot(run.pd_data[components])
+  fig.subplots()
+  return fig
+
+def get_plot(run, components, name):
+  """ Generate the chart/plot as a png. Components are the already filtered and sorted columns to plot.
+  """
+  with plot_lock:
+    return draw_plot(plot_figure(), run, components, name)
+
+def draw_plot(fig, run, components, name):
+  """ Draw the chart on to the figure and return it as a base64 png.
+  """
+  ax = fig.axes[0]
+  ax.clear()
+  ax.plot(run.plot_data[:, [run.component_columns[component] for component in components]])
   ax.legend(components, title='Efficiency', loc='center left', bbox_to_anchor=(1,0,0.50,1))
   ax.set(xlabel='Five minute slices', ylabel='Devices available, or Percent active',
         title=f'Moon Mole LDT simulation: {name} results')
@@ -100,18 +129,14 @@ def create():
   """
   if request.method == 'POST':
     run = RunReport(request)
-    checked_boxes = request.form.getlist('included_columns')
-    for checkbox in run.base_components:
-      if checkbox not in checked_boxes:
-        run.columns_to_exclude.append(checkbox)
     run_report = simulation(run)
-    populate_pandas_dataframe(run)
+    populate_plot_data(run)
     printable_report = define_base_report(run_report)
     if run.truck_components:
-      truck_plot = get_plot(run, run.truck_components, 'Mining Truck')
+      truck_plot = get_plot(run, run.truck_plot_columns, 'Mining Truck')
       printable_report +=  f"<img src='data:img/png;base64,{truck_plot}'/>"
     if run.station_components:
-      station_plot = get_plot(run, run.station_components, 'Unloading Station')
+      station_plot = get_plot(run, run.station_plot_columns, 'Unloading Station')
       printable_report += f"<img src='data:img/png;base64,{station_plot}'/>"
     printable_report += '<hr><br><a href=.>Run a new simulation</a>'
     return printable_report
@@ -4,28 +4,68 @@ Calulate total loads of ore generated and efficent use of each component.
 """
 
 import sys
-from collections import Counter
+import functools
+import heapq
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import logging
 import argparse
-from components import Truck, Station, MiningRun, TruckStatus, StationStatus
+import numpy as np
+from components import (Truck, Station, TruckArray, StationArray, MiningRun, TruckStatus, StationStatus,
+    NUM_TRUCK_STATES, NUM_STATION_STATES, TRUCK_IDLE, TRUCK_MINING, STATION_IDLE, STATION_BUSY, step_trucks,
+    step_stations)
+from simulate_kernel import CORE_COMPILED, run_kernel
 
 
 CSV_FILENAME = "mining_report.csv"
-# Making this a lambda keeps both pyunittest and flask happy. (Building a proper library would be out of scope.)
-ARGS = lambda: None  # pylint: disable=unnecessary-lambda-assignment
-ARGS.comment='Redefined in main for unit test purposes.'
-ARGS.detail_report_trucks=False
-ARGS.detail_report_stations=False
+# Fleets up to this size run quicker jumping between events than stepping as arrays.
+# Event work grows with every truck transition, the array steps cost about the same for any fleet size.
+EVENT_PATH_MAX_TRUCKS = 250
+# About how many truck slices the event path gets through in the time it takes to import numba and load the
+# compiled core. Smaller runs are not worth that start up wait, however quick the core is once loaded.
+CORE_MIN_TRUCK_SLICES = 2_000_000
+
+@dataclass(frozen=True)
+class Args:
+  """ Command line parameters. The defaults are the command line defaults.
+  """
+  # pylint: disable=too-many-instance-attributes
+  run_hours: int = 72
+  truck_count: int = 1
+  station_count: int = 1
+  verbose_trucks: bool = False
+  verbose_stations: bool = False
+  detail_report_trucks: bool = False
+  detail_report_stations: bool = False
+  no_slice_report: bool = False
+  sweep: bool = False
+  no_csv: bool = False
+  seed: int | None = None
+
+# Defaults keep both pytest and flask happy, main replaces them with the parsed command line.
+ARGS = Args()
 
 TIME_SLICE_REPORT_ORDER = [TruckStatus.MINING, TruckStatus.TRAVELING_TO_STATION, TruckStatus.IDLE,
     TruckStatus.UNLOADING, TruckStatus.TRAVELING_TO_MINE, StationStatus.BUSY, StationStatus.IDLE]
+# Column code of each reported activity, as counted by every simulation path.
+TIME_SLICE_REPORT_CODES = np.array([status.value - 1 if isinstance(status, TruckStatus)
+    else NUM_TRUCK_STATES + status.value - 1 for status in TIME_SLICE_REPORT_ORDER], dtype=np.intp)
 
-def initialize_time_slice_report() ->list:
-  """ Create a data object to hold time series data about the simulation run.
+# Column headers of the time series. They only depend on the report order, so they are built once.
+TIME_SLICE_REPORT_HEADER = [['','Mining Truck','','','','','','Unloading Station'],
+                            ['Slice Count'] + [column.name for column in TIME_SLICE_REPORT_ORDER]]
+TIME_SLICE_REPORT_CSV_HEADER = ''.join(','.join(header_line)+'\n' for header_line in TIME_SLICE_REPORT_HEADER)
+# printf style format of one time series row, slice count then every reported activity.
+TIME_SLICE_ROW_FORMAT = ','.join(['%d'] * (1 + len(TIME_SLICE_REPORT_ORDER))) + '\n'
+
+def initialize_time_slice_body(n_slices: int) -> np.ndarray:
+  """ Create the numeric part of the time series, one row per slice starting with the slice count.
+      The column headers are kept separately, in TIME_SLICE_REPORT_HEADER.
   """
-  time_slice_report = [['','Mining Truck','','','','','','Unloading Station'],['Slice Count']]
-  for column in TIME_SLICE_REPORT_ORDER:
-    time_slice_report[1].append(column.name)
-  return time_slice_report
+  time_slice_body = np.zeros((n_slices, 1 + len(TIME_SLICE_REPORT_ORDER)), dtype=np.int32)
+  time_slice_body[:, 0] = np.arange(n_slices)
+  return time_slice_body
 
 def initialize_simulation_definition()  -> MiningRun:
   """ Instantiate a simulation object specific for this run with basic simulation parameters.
@@ -38,7 +78,8 @@ def initialize_simulation_definition()  -> MiningRun:
       num_trucks = ARGS.truck_count,
       num_stations = ARGS.station_count,
       verbose_trucks = ARGS.verbose_trucks,
-      verbose_stations = ARGS.verbose_stations)
+      verbose_stations = ARGS.verbose_stations,
+      seed = ARGS.seed)
 
   # Second add constants as defined by the customer's design
   # ToDo:  Make these parameters modifiable at the command line.
@@ -56,99 +97,227 @@ def initialize_simulation_definition()  -> MiningRun:
 def initialize_trucks(simulation_parameters: MiningRun) -> list[Truck]:
   """ Instantiate simulated mining trucks.
   """
-  # ToDo: Change this to a list comprehension.
-  trucks = []
-  for truck_num in range(simulation_parameters.num_trucks):
-    trucks.append(Truck(simulation_parameters=simulation_parameters, name=f'truck {truck_num}'))
-  return trucks
+  # Draw every truck's first mining time in one call, in the same order each truck would draw its own.
+  mining_times = simulation_parameters.generate_mining_times(simulation_parameters.num_trucks).tolist()
+  return [Truck(simulation_parameters=simulation_parameters, name=f'truck {truck_num}', mining_time=mining_time)
+          for truck_num, mining_time in enumerate(mining_times)]
 
 def initialize_unloading_stations(simulation_parameters: MiningRun) -> list[Station]:
   """ Instantiate simulated unloading stations.
   """
-  # ToDo: Change this to a list comprehension.
-  stations = []
-  for station_num in range(simulation_parameters.num_stations):
-    stations.append(Station(simulation_parameters=simulation_parameters, name=f'station {station_num}',
-        verbose=simulation_parameters.verbose_stations))
-  return stations
+  # Stations queue themselves as idle when created, so start from an empty queue.
+  simulation_parameters.idle_stations.clear()
+  return [Station(simulation_parameters=simulation_parameters, name=f'station {station_num}',
+                  verbose=simulation_parameters.verbose_stations)
+          for station_num in range(simulation_parameters.num_stations)]
 
-def run_simulation(simulation_parameters: MiningRun, stations: list[Station], trucks: list[Truck]) -> list:
+def report_state_counts(truck_counts: np.ndarray | list[int], station_counts: np.ndarray | list[int],
+                        counts: np.ndarray, report_line: np.ndarray):
+  """ Copy the number of trucks and stations in each state code into report_line, in time series column order.
+      counts is scratch space for the NUM_TRUCK_STATES + NUM_STATION_STATES counts, reused every slice.
+  """
+  counts[:NUM_TRUCK_STATES] = truck_counts
+  counts[NUM_TRUCK_STATES:] = station_counts
+  np.take(counts, TIME_SLICE_REPORT_CODES, out=report_line)
+
+def run_simulation(simulation_parameters: MiningRun, stations: list[Station], trucks: list[Truck],
+                   record_slices: bool = True) -> np.ndarray:
   """ Step through the simulated run in five minute slices.
+      The whole fleet is moved at once as arrays, then copied back to the trucks and stations at the end.
+      Verbose output comes from the objects themselves, so verbose runs step each truck and station in turn.
+      Without record_slices only the trucks and stations are updated, and the time series comes back empty.
   """
-  time_slice_report = initialize_time_slice_report()
+  n_slices = simulation_parameters.run_time_slices()
+  time_slice_report = initialize_time_slice_body(n_slices if record_slices else 0)
+  # Fixed size tally, allocated once for the run.
+  counts = np.empty(NUM_TRUCK_STATES + NUM_STATION_STATES, dtype=np.int32)
 
-  # Loop through the simulation time in five minute slices.
-  for time_slice in range(simulation_parameters.run_time_slices()):
-    slice_report = Counter()
+  if simulation_parameters.verbose_trucks or simulation_parameters.verbose_stations:
+    station_counts = [0] * NUM_STATION_STATES
+    # Loop through the simulation time in five minute slices.
+    for time_slice in range(n_slices):
+      # First process stations, so that busy stations can be idled. Every station is idle after this pass.
+      for station in stations:
+        station.cycle()
+      # Second move truck between various tasks, counting trucks as they go.
+      # A station is only busy this slice if a truck attached to it, so the stations need no pass of their own.
+      truck_counts = [0] * NUM_TRUCK_STATES
+      busy_stations = 0
+      for truck in trucks:
+        if truck.cycle(stations) is not None:
+          busy_stations += 1
+        truck_counts[truck.state - 1] += 1
+      if record_slices:
+        station_counts[STATION_BUSY] = busy_stations
+        station_counts[STATION_IDLE] = len(stations) - busy_stations
+        report_state_counts(truck_counts, station_counts, counts, time_slice_report[time_slice, 1:])
+    return time_slice_report
 
-    # First process stations, so that busy stations can be idled.
-    for station in stations:
-      station.cycle()
+  # Narrow timers keep the fleet arrays small. The compiled kernel is built for int32 timers, so only here.
+  truck_array = TruckArray.from_trucks(trucks, simulation_parameters.timer_dtype())
+  station_array = StationArray.from_stations(stations, trucks, simulation_parameters.idle_stations)
+  for time_slice in range(n_slices):
+    step_stations(station_array, simulation_parameters.slice_time)
+    step_trucks(truck_array, station_array, simulation_parameters)
+    if record_slices:
+      # The arrays keep their state counts up to date as devices transition, no need to count the fleet.
+      report_state_counts(truck_array.state_counts, station_array.state_counts, counts,
+                          time_slice_report[time_slice, 1:])
+  truck_array.to_trucks(trucks)
+  station_array.to_stations(stations, trucks, simulation_parameters.idle_stations)
+  return time_slice_report
 
-    # Second move truck between various tasks.
-    for truck in trucks:
-      truck.cycle(stations)
-      # Update counter for how much time each truck spends in each state.
-      slice_report[truck.state] += 1
+def run_simulation_events(simulation_parameters: MiningRun, stations: list[Station], trucks: list[Truck],
+                          record_slices: bool = True) -> np.ndarray:
+  """ Jump from one state change to the next, rather than stepping every truck through every five minute slice.
+      Same rules and results as run_simulation. Within a slice busy stations are released first,
+      then trucks transition in fleet order, so stations are handed out and mining times drawn in the same order.
+      Without record_slices the count changes are skipped, and the time series comes back empty.
+  """
+  # pylint: disable=too-many-locals,too-many-branches
+  n_slices = simulation_parameters.run_time_slices()
+  slice_time = simulation_parameters.slice_time
+  station_numbers = {station: station_num for station_num, station in enumerate(stations)}
+  start_busy_minutes = [station.busy_minutes for station in stations]
+  # Changes in each slice's activity counts, indexed by column code. Summed up into the time series at the end.
+  count_changes = np.zeros((n_slices + 1, NUM_TRUCK_STATES + NUM_STATION_STATES), dtype=np.int32)
+  busy_code = NUM_TRUCK_STATES + STATION_BUSY
+  idle_code = NUM_TRUCK_STATES + STATION_IDLE
 
-    # Third pass through stations again, recording status.
-    for station in stations:
-      # Update counter for how much time each station spends in each state.
-      # We do this in a separate pass since all stations become idle for each slice.
-      slice_report[station.state] += 1
-
-    # Copy individual time slice data into time series data object.
-    time_slice_report_line = [time_slice]
-    for reportable_activity in TIME_SLICE_REPORT_ORDER:
-      # If any instances of each activity have been recorded, copy that to the CSV.
-      if activity_count := slice_report[reportable_activity]:
-        time_slice_report_line.append(activity_count)
+  # Events are (slice, 0 for a station release or 1 for a truck transition, device number).
+  # A truck counts down remaining_time a slice at a time, then transitions on the following slice.
+  # A remaining_time that never lands on zero never transitions, those trucks are kept aside as (slice, truck number).
+  events = []
+  stalled = []
+  for truck_num, truck in enumerate(trucks):
+    count_changes[0, truck.state - 1] += 1
+    if truck.remaining_time < 0 or truck.remaining_time % slice_time:
+      stalled.append((-1, truck_num))
+    else:
+      events.append((truck.remaining_time // slice_time, 1, truck_num))
+  for station_num, station in enumerate(stations):
+    count_changes[0, NUM_TRUCK_STATES + station.state - 1] += 1
+    if station.state == StationStatus.BUSY:
+      events.append((0, 0, station_num))
+  heapq.heapify(events)
+
+  while events and events[0][0] < n_slices:
+    time_slice, is_truck, device_num = heapq.heappop(events)
+    if is_truck:
+      truck = trucks[device_num]
+      from_code = truck.state - 1
+      if attached_station := truck.transition(stations):
+        heapq.heappush(events, (time_slice + 1, 0, station_numbers[attached_station]))
+        if record_slices:
+          count_changes[time_slice, idle_code] -= 1
+          count_changes[time_slice, busy_code] += 1
+      if record_slices:
+        count_changes[time_slice, from_code] -= 1
+        count_changes[time_slice, truck.state - 1] += 1
+      if truck.remaining_time < 0 or truck.remaining_time % slice_time:
+        stalled.append((time_slice, device_num))
       else:
-        # Otherwise record 0.
-        time_slice_report_line.append(0)
-    time_slice_report.append(time_slice_report_line)
+        heapq.heappush(events, (time_slice + truck.remaining_time // slice_time + 1, 1, device_num))
+    else:
+      # Busy stations only ever stay busy for the one slice.
+      stations[device_num].cycle()
+      if record_slices:
+        count_changes[time_slice, busy_code] -= 1
+        count_changes[time_slice, idle_code] += 1
+
+  # Trucks still counting down at the end of the run, work out how far they got.
+  for event_slice, is_truck, device_num in events:
+    if is_truck:
+      trucks[device_num].remaining_time = (event_slice - n_slices) * slice_time
+  for time_slice, truck_num in stalled:
+    trucks[truck_num].remaining_time -= (n_slices - 1 - time_slice) * slice_time
+  # Every slice a station is not released, it is idle.
+  for station, busy_minutes in zip(stations, start_busy_minutes):
+    station.idle_minutes += n_slices * slice_time - (station.busy_minutes - busy_minutes)
+
+  time_slice_report = initialize_time_slice_body(n_slices if record_slices else 0)
+  if record_slices:
+    time_slice_report[:, 1:] = np.cumsum(count_changes[:n_slices], axis=0)[:, TIME_SLICE_REPORT_CODES]
+  return time_slice_report
+
+def run_simulation_core(simulation_parameters: MiningRun, stations: list[Station], trucks: list[Truck],
+                        record_slices: bool = True) -> np.ndarray:
+  """ Step through the simulated run using the compiled simulation kernel.
+      Works on the same arrays as run_simulation, and copies the results back to the trucks and stations the same way.
+      The kernel always counts, it is cheap there. Without record_slices the time series comes back empty.
+  """
+  n_slices = simulation_parameters.run_time_slices()
+  slice_time = simulation_parameters.slice_time
+  truck_array = TruckArray.from_trucks(trucks)
+  station_array = StationArray.from_stations(stations, trucks, simulation_parameters.idle_stations)
+  # A truck starts at most one mining trip per full cycle. Draw them all up front, the kernel hands them out in order.
+  # Negative step times never count down to zero and stall the truck, so they can only shorten the count.
+  shortest_cycle = 4 + sum(max(step_time, 0) for step_time in (
+      simulation_parameters.inbound_travel_time, simulation_parameters.unloading_time,
+      simulation_parameters.outbound_travel_time, simulation_parameters.min_mining_hours * 60)) // slice_time
+  mining_times = simulation_parameters.generate_mining_times(len(trucks) * (n_slices // shortest_cycle + 1))
+
+  slice_counts, idle_stations = run_kernel(
+      n_slices, truck_array.state, truck_array.remaining_time, truck_array.current_cycle_mining_time,
+      truck_array.completed_loads, truck_array.time_in_state, station_array.state, station_array.attached_truck,
+      station_array.busy_minutes, station_array.idle_minutes, station_array.completed_loads,
+      np.array(station_array.idle_queue, dtype=np.int32), mining_times,
+      simulation_parameters.inbound_travel_time, simulation_parameters.outbound_travel_time,
+      simulation_parameters.unloading_time, simulation_parameters.idle_wait_time, slice_time)
+  station_array.idle_queue = deque(idle_stations.tolist())
+
+  truck_array.to_trucks(trucks)
+  station_array.to_stations(stations, trucks, simulation_parameters.idle_stations)
+  time_slice_report = initialize_time_slice_body(n_slices if record_slices else 0)
+  if record_slices:
+    time_slice_report[:, 1:] = slice_counts[:, TIME_SLICE_REPORT_CODES]
   return time_slice_report
 
 def summarize_truck_results(simulation_parameters: MiningRun, trucks: list[Truck]):
   """ Summarize truck results.
   """
-  for truck in trucks:
-    simulation_parameters.total_load_count += truck.completed_loads
-    # ToDo: Change the 'time_logs' to full attibutes. Do this everywhere.
-    # Adding that here, since this is the first place in the code 'time_logs' is mentioned.
-    simulation_parameters.total_idle_truck_time += truck.time_logs['IDLE']
-    simulation_parameters.total_busy_truck_time += truck.time_logs['MINING']
-    if ARGS.detail_report_trucks:
+  simulation_parameters.total_load_count += sum(truck.completed_loads for truck in trucks)
+  # Gather every truck's time in state once, then total each state with one reduction.
+  state_totals = np.array([truck.time_in_state for truck in trucks], dtype=np.int64).reshape(
+      -1, NUM_TRUCK_STATES).sum(axis=0)
+  simulation_parameters.total_idle_truck_time += int(state_totals[TRUCK_IDLE])
+  simulation_parameters.total_busy_truck_time += int(state_totals[TRUCK_MINING])
+  if ARGS.detail_report_trucks:
+    for truck in trucks:
       print(truck.generate_report())
 
 def summarize_station_results(simulation_parameters: MiningRun, stations: list[Station]):
   """ Summarize station results.
   """
-  for station in stations:
-    # ToDo: Change the 'time_logs' to full attibutes. Do this everywhere.
-    simulation_parameters.total_idle_station_time += station.idle_minutes
-    simulation_parameters.total_busy_station_time += station.busy_minutes
-    if ARGS.detail_report_stations:
+  simulation_parameters.total_idle_station_time += sum(station.idle_minutes for station in stations)
+  simulation_parameters.total_busy_station_time += sum(station.busy_minutes for station in stations)
+  if ARGS.detail_report_stations:
+    for station in stations:
       print(station.generate_report())
 
-def generate_final_report_and_csv_file(simulation_parameters: MiningRun, time_slice_report: list):
+def generate_final_report_and_csv_file(simulation_parameters: MiningRun, time_slice_report: np.ndarray):
   """ Generate, Print, and Write CSV time slide report.
+      A run with no time slices has nothing to report, so no file is written.
   """
+  if not simulation_parameters.run_time_slices():
+    return
   with open(CSV_FILENAME, 'w', encoding='utf-8') as report_file:
-    report_file.write(simulation_parameters.generate_csv_report())
-    for slice_line in time_slice_report:
-      report_file.write(','.join(map(str,slice_line))+'\n')
+    # Format the whole time series with one % operation, then hand the report to the file in a single write.
+    # (np.savetxt formats and writes row by row, which is about three times slower.)
+    report_file.write(simulation_parameters.generate_csv_report() + TIME_SLICE_REPORT_CSV_HEADER
+                      + (TIME_SLICE_ROW_FORMAT * len(time_slice_report)) % tuple(time_slice_report.ravel().tolist()))
 
-def parse_args():
-  """ Define command line parameters. When called deliver parameters in a parameter object.
+@functools.cache
+def build_parser() -> argparse.ArgumentParser:
+  """ Define command line parameters. Built once, parse_args reuses it.
   """
   parser = argparse.ArgumentParser(prog='simulate', usage=r'%(prog)s [options]')
 
-  parser.add_argument('--run_hours',  type=int, default=72,
+  parser.add_argument('--run_hours',  type=int, default=Args.run_hours,
     help='Define total time to run simulation in hours. (int)')
-  parser.add_argument('--truck_count',  type=int, default=1,
+  parser.add_argument('--truck_count',  type=int, default=Args.truck_count,
     help='Define number of mining trucks to include in the simulation. (int)')
-  parser.add_argument('--station_count',  type=int, default=1,
+  parser.add_argument('--station_count',  type=int, default=Args.station_count,
     help='Define number of unloading stations to include in the simulation, (int)')
   parser.add_argument('--verbose_trucks', action='store_true',
     help='Print truck transitions and actions during simulation run. (flag)')
@@ -158,26 +327,108 @@ def parse_args():
     help='Print individual truck report after simulation run. (flag)')
   parser.add_argument('--detail_report_stations', action='store_true',
     help='Print individual station report after simulation run. (flag)')
+  parser.add_argument('--no_slice_report', action='store_true',
+    help='Leave the five minute time series out of the CSV report. (flag)')
+  parser.add_argument('--sweep', action='store_true',
+    help='Run every truck count up to truck_count against every station count up to station_count, in parallel.'
+         ' Print a summary of each run instead of the usual report. (flag)')
+  parser.add_argument('--no_csv', action='store_true',
+    help='Only print the summary report, do not write the CSV report file. (flag)')
+  parser.add_argument('--seed', type=int, default=Args.seed,
+    help='Seed the random mining times, so a run can be repeated exactly. (int)')
 
-  return parser.parse_args()
+  return parser
+
+def parse_args(argv: list[str] | None = None) -> Args:
+  """ When called deliver command line parameters in a parameter object.
+      Reads sys.argv unless given an argument list, tests pass an empty list for the defaults.
+  """
+  return Args(**vars(build_parser().parse_args(argv)))
 
-def simulation(simulation_parameters: MiningRun):
+def run_fleet(simulation_parameters: MiningRun, stations: list[Station], trucks: list[Truck],
+              record_slices: bool = True) -> np.ndarray:
+  """ Run the simulation on the quickest path that supports the run's options.
+  """
+  # Verbose output only exists in the slice by slice object model. Otherwise use the compiled core for big runs,
+  # and for the rest jump between events for small fleets and step large fleets as arrays.
+  if simulation_parameters.verbose_trucks or simulation_parameters.verbose_stations:
+    return run_simulation(simulation_parameters, stations, trucks, record_slices)
+  if CORE_COMPILED and len(trucks) * simulation_parameters.run_time_slices() >= CORE_MIN_TRUCK_SLICES:
+    return run_simulation_core(simulation_parameters, stations, trucks, record_slices)
+  if len(trucks) <= EVENT_PATH_MAX_TRUCKS:
+    return run_simulation_events(simulation_parameters, stations, trucks, record_slices)
+  return run_simulation(simulation_parameters, stations, trucks, record_slices)
+
+def simulation(simulation_parameters: MiningRun, record_slices: bool = True, write_csv: bool = True):
   """ Assign variables, generate and run report.
+      Without record_slices the time series is not kept, and the CSV file has no time series rows.
+      Without write_csv no CSV file is written at all.
   """
   # Initialize simulated devices.
   trucks = initialize_trucks(simulation_parameters)
   stations = initialize_unloading_stations(simulation_parameters)
 
   # Run actual simulation.
-  time_slice_report = run_simulation(simulation_parameters, stations, trucks)
+  time_slice_report = run_fleet(simulation_parameters, stations, trucks, record_slices)
+  simulation_parameters.time_slice_report = time_slice_report
 
   # Generate and deliver reports
   summarize_truck_results(simulation_parameters, trucks)
   summarize_station_results(simulation_parameters, stations)
-  generate_final_report_and_csv_file(simulation_parameters, time_slice_report)
+  if write_csv:
+    generate_final_report_and_csv_file(simulation_parameters, time_slice_report)
 
   return simulation_parameters
 
+def grid_run(truck_count: int, station_count: int, run_hours: int, seed: int | None = None) -> tuple[int, int, int]:
+  """ One run of a parameter sweep, without a time series or CSV file.
+      Returns total loads, truck efficiency and station efficiency.
+  """
+  simulation_parameters = MiningRun(num_trucks=truck_count, num_stations=station_count, run_hours=run_hours,
+                                    seed=seed)
+  trucks = initialize_trucks(simulation_parameters)
+  stations = initialize_unloading_stations(simulation_parameters)
+  run_fleet(simulation_parameters, stations, trucks, record_slices=False)
+  summarize_truck_results(simulation_parameters, trucks)
+  summarize_station_results(simulation_parameters, stations)
+  return (simulation_parameters.total_load_count, simulation_parameters.generate_truck_efficiency(),
+          simulation_parameters.generate_station_efficiency())
+
+# Results of seeded sweep runs, by grid_run arguments. Seeded runs always come out the same,
+# so repeated or overlapping sweeps in this process only send new combinations to the workers.
+GRID_RESULTS: dict[tuple[int, int, int, int | None], tuple[int, int, int]] = {}
+
+def run_grid(truck_counts: list[int], station_counts: list[int], run_hours: int, seed: int | None = None
+             ) -> np.ndarray:
+  """ Run every combination of truck and station counts, spread over all cores.
+      Returns an array indexed by truck count position, then station count position,
+      of total loads, truck efficiency and station efficiency.
+      With a seed, combinations already in GRID_RESULTS are not run again.
+  """
+  run_keys = [(truck_count, station_count, run_hours, seed)
+              for truck_count in truck_counts for station_count in station_counts]
+  results = {run_key: GRID_RESULTS[run_key] for run_key in run_keys if seed is not None and run_key in GRID_RESULTS}
+  new_keys = [run_key for run_key in dict.fromkeys(run_keys) if run_key not in results]
+  if new_keys:
+    with ProcessPoolExecutor() as executor:
+      futures = {run_key: executor.submit(grid_run, *run_key) for run_key in new_keys}
+      results.update((run_key, future.result()) for run_key, future in futures.items())
+    if seed is not None:
+      GRID_RESULTS.update(results)
+  return np.array([results[run_key] for run_key in run_keys], dtype=np.int64).reshape(
+      len(truck_counts), len(station_counts), 3)
+
+def print_sweep(run_hours: int, max_trucks: int, max_stations: int, seed: int | None = None):
+  """ Sweep every fleet size up to the given counts, and print a summary line for each as CSV.
+  """
+  truck_counts = list(range(1, max_trucks + 1))
+  station_counts = list(range(1, max_stations + 1))
+  results = run_grid(truck_counts, station_counts, run_hours, seed)
+  print('Trucks,Stations,Total Loads,Truck Efficiency,Station Efficiency')
+  for truck_count, truck_results in zip(truck_counts, results.tolist()):
+    for station_count, (load_count, truck_efficiency, station_efficiency) in zip(station_counts, truck_results):
+      print(f'{truck_count},{station_count},{load_count},{truck_efficiency},{station_efficiency}')
+
 def main():
   """ Set up, run, then report on a simulated mining run.
   """
@@ -186,8 +437,16 @@ def main():
   # Specifically setting the global 'ARGS' to make unit testing more straightforward.
   global ARGS
   ARGS = parse_args()
+  if ARGS.verbose_trucks or ARGS.verbose_stations:
+    # Verbose components report through the debug log, send it to the console.
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s', stream=sys.stdout)
+  if ARGS.sweep:
+    print_sweep(ARGS.run_hours, ARGS.truck_count, ARGS.station_count, ARGS.seed)
+    return
   simulation_parameters = initialize_simulation_definition()
-  simulation_parameters = simulation(simulation_parameters)
+  # Only the CSV file uses the time series, skip it when there will be no file.
+  simulation_parameters = simulation(simulation_parameters, record_slices=not (ARGS.no_slice_report or ARGS.no_csv),
+                                     write_csv=not ARGS.no_csv)
 
   print(simulation_parameters.generate_report())
 
@@ -0,0 +1,122 @@
+""" Compiled core of the lunar mining simulation.
+The same rules as step_trucks and step_stations, written as plain loops over the same arrays so numba can compile them.
+Kept out of components.py since numba needs plain python functions to compile.
+An ahead of time build from build_kernels.py is used when present, otherwise numba compiles on first call.
+"""
+
+import os
+import functools
+import importlib.util
+import numpy as np
+from components import (TRUCK_IDLE, TRUCK_MINING, TRUCK_UNLOADING, TRUCK_TRAVELING_TO_MINE,
+    TRUCK_TRAVELING_TO_STATION, NUM_TRUCK_STATES, STATION_IDLE, STATION_BUSY, NUM_STATION_STATES)
+
+
+def run_kernel_py(n_slices, truck_state, truck_rem, truck_mining, completed_loads, time_in_state,
+                  station_state, station_attach, busy_minutes, idle_minutes, station_loads, idle_stations,
+                  mining_times, inbound, outbound, unload, idle_wait, slice_time):
+  """
+      Run the full simulation over the TruckArray and StationArray fields, which are updated in place.
+      Follows exactly the same rules as step_stations and step_trucks, one five minute slice at a time.
+      idle_stations lists the queued idle station numbers in order, mining_times is handed out in order.
+      Returns the per slice counts, indexed by truck state code then NUM_TRUCK_STATES + station state code,
+      and the idle station queue left at the end.
+  """
+  # pylint: disable=too-many-arguments,too-many-locals,too-many-branches,too-many-statements
+  # Kept as one flat function so numba can compile it to a single native loop.
+  n_trucks = len(truck_state)
+  n_stations = len(station_state)
+  # Ring buffer of idle stations, in the order they became idle. Every release follows an attach that took a
+  # station off the queue, so it never holds more than its starting length plus the number of stations.
+  queue_size = len(idle_stations) + n_stations + 1
+  idle_queue = np.empty(queue_size, np.int32)
+  idle_queue[:len(idle_stations)] = idle_stations
+  idle_head = 0
+  idle_count = len(idle_stations)
+  mining_idx = 0
+  slice_counts = np.zeros((n_slices, NUM_TRUCK_STATES + NUM_STATION_STATES), np.int32)
+
+  for s in range(n_slices):
+    # First process stations, so that busy stations can be idled.
+    for st in range(n_stations):
+      if station_state[st] == STATION_BUSY:
+        busy_minutes[st] += slice_time
+        station_state[st] = STATION_IDLE
+        station_attach[st] = -1
+        station_loads[st] += 1
+        idle_queue[(idle_head + idle_count) % queue_size] = st
+        idle_count += 1
+      else:
+        idle_minutes[st] += slice_time
+
+    # Second move trucks between various tasks.
+    for t in range(n_trucks):
+      if truck_rem[t]:
+        truck_rem[t] -= slice_time
+      elif truck_state[t] == TRUCK_MINING:
+        time_in_state[t, TRUCK_MINING] += truck_mining[t]
+        truck_state[t] = TRUCK_TRAVELING_TO_STATION
+        truck_rem[t] = inbound
+      elif truck_state[t] == TRUCK_UNLOADING:
+        time_in_state[t, TRUCK_UNLOADING] += unload
+        completed_loads[t] += 1
+        truck_state[t] = TRUCK_TRAVELING_TO_MINE
+        truck_rem[t] = outbound
+      elif truck_state[t] == TRUCK_TRAVELING_TO_MINE:
+        time_in_state[t, TRUCK_TRAVELING_TO_MINE] += outbound
+        truck_state[t] = TRUCK_MINING
+        truck_rem[t] = mining_times[mining_idx]
+        truck_mining[t] = truck_rem[t]
+        mining_idx += 1
+      else:
+        # Arriving from travel and retrying from idle are the same activity.
+        if truck_state[t] == TRUCK_IDLE:
+          time_in_state[t, TRUCK_IDLE] += idle_wait
+        time_in_state[t, TRUCK_TRAVELING_TO_STATION] += inbound
+        truck_state[t] = TRUCK_IDLE
+        truck_rem[t] = idle_wait
+        while idle_count:
+          st = idle_queue[idle_head]
+          idle_head = (idle_head + 1) % queue_size
+          idle_count -= 1
+          # Skip stations that were attached without going through the queue.
+          if station_state[st] != STATION_BUSY:
+            station_state[st] = STATION_BUSY
+            station_attach[st] = t
+            truck_state[t] = TRUCK_UNLOADING
+            truck_rem[t] = unload
+            break
+      slice_counts[s, truck_state[t]] += 1
+
+    for st in range(n_stations):
+      slice_counts[s, NUM_TRUCK_STATES + station_state[st]] += 1
+
+  idle_left = np.empty(idle_count, np.int32)
+  for i in range(idle_count):
+    idle_left[i] = idle_queue[(idle_head + i) % queue_size]
+  return slice_counts, idle_left
+
+@functools.cache
+def jit_kernel():
+  """ run_kernel_py compiled by numba. Only built on first use, as importing numba alone is a noticeable wait.
+  """
+  from numba import jit  # pylint: disable=import-outside-toplevel
+  return jit(nopython=True, cache=True)(run_kernel_py)
+
+def jit_run_kernel(*args):
+  """ Same as run_kernel_py, compiled by numba on first call.
+  """
+  return jit_kernel()(*args)
+
+# The ahead of time build skips the JIT warm up, and does not need numba installed, or even imported, to run.
+# Otherwise numba compiles run_kernel_py on first call. NUMBA_DISABLE_JIT=1 still forces the plain python kernel.
+JIT_DISABLED = os.environ.get('NUMBA_DISABLE_JIT', '0') != '0'
+try:
+  if JIT_DISABLED:
+    raise ImportError('Compiled simulation kernel disabled.')
+  from mining_core import run_kernel  # pylint: disable=unused-import
+  CORE_COMPILED = True
+except ImportError:
+  # Numba is optional. Without it the simulation core runs as plain python.
+  CORE_COMPILED = not JIT_DISABLED and importlib.util.find_spec('numba') is not None
+  run_kernel = jit_run_kernel if CORE_COMPILED else run_kernel_py
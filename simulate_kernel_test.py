@@ -0,0 +1,43 @@
+""" Unit tests for the compiled core of moon mining simulator.
+For portablity I have used only the most basic pytest functions.
+No Mocks, or Magic, or fancy assert types. Only the most simple.
+"""
+# pylint: disable=missing-function-docstring,invalid-name
+
+import numpy as np
+import components
+import simulate_kernel
+
+def check_run_kernel(run_kernel):
+  # One hour of mining, then travel, unloading, and heading back out within a two hour run.
+  truck_state = np.array([components.TRUCK_MINING], dtype=np.int8)
+  truck_rem = np.array([60], dtype=np.int32)
+  completed_loads = np.zeros(1, dtype=np.int32)
+  time_in_state = np.zeros((1, components.NUM_TRUCK_STATES), dtype=np.int32)
+  station_state = np.array([components.STATION_IDLE], dtype=np.int8)
+  busy_minutes = np.zeros(1, dtype=np.int32)
+  idle_minutes = np.zeros(1, dtype=np.int32)
+  station_loads = np.zeros(1, dtype=np.int32)
+  slice_counts, idle_stations = run_kernel(
+      24, truck_state, truck_rem, truck_rem.copy(), completed_loads, time_in_state, station_state,
+      np.full(1, -1, dtype=np.int32), busy_minutes, idle_minutes, station_loads, np.zeros(1, dtype=np.int32),
+      np.full(2, 60, dtype=np.int32), 30, 30, 5, 5, 5)
+
+  assert truck_state[0] == components.TRUCK_TRAVELING_TO_MINE
+  assert completed_loads[0] == 1
+  assert list(time_in_state[0]) == [0, 60, 5, 0, 30]
+  assert station_state[0] == components.STATION_IDLE
+  assert busy_minutes[0] == 5
+  assert idle_minutes[0] == 115
+  assert station_loads[0] == 1
+  assert list(idle_stations) == [0]
+  assert slice_counts.shape == (24, 7)
+  assert slice_counts[19, components.TRUCK_UNLOADING] == 1
+  assert slice_counts[19, components.NUM_TRUCK_STATES + components.STATION_BUSY] == 1
+
+def test_run_kernel():
+  check_run_kernel(simulate_kernel.run_kernel)
+
+def test_run_kernel_py():
+  # The python version is what gets compiled, check it directly too.
+  check_run_kernel(simulate_kernel.run_kernel_py)
@@ -5,18 +5,34 @@ No Mocks, or Magic, or fancy assert types. Only the most simple.
 # pylint: disable=missing-function-docstring,invalid-name
 
 
+import components
 import simulate
 
-def test_initialize_time_slice_report():
+def test_time_slice_report_header():
   expected = [['', 'Mining Truck', '', '', '', '', '', 'Unloading Station'],
               ['Slice Count', 'MINING', 'TRAVELING_TO_STATION', 'IDLE', 'UNLOADING',
                   'TRAVELING_TO_MINE', 'BUSY', 'IDLE']]
 
-  detected = simulate.initialize_time_slice_report()
-  assert detected == expected
+  assert simulate.TIME_SLICE_REPORT_HEADER == expected
+  assert simulate.TIME_SLICE_REPORT_CSV_HEADER == ''.join(','.join(header_line) + '\n' for header_line in expected)
+
+def test_time_slice_report_codes():
+  # Report columns: truck MINING, TRAVELING_TO_STATION, IDLE, UNLOADING, TRAVELING_TO_MINE, then station BUSY, IDLE.
+  expected = [components.TRUCK_MINING, components.TRUCK_TRAVELING_TO_STATION, components.TRUCK_IDLE,
+              components.TRUCK_UNLOADING, components.TRUCK_TRAVELING_TO_MINE,
+              components.NUM_TRUCK_STATES + components.STATION_BUSY,
+              components.NUM_TRUCK_STATES + components.STATION_IDLE]
+  assert list(simulate.TIME_SLICE_REPORT_CODES) == expected
+
+def test_parse_args():
+  assert simulate.parse_args([]) == simulate.Args()
+  expected = simulate.Args(truck_count=3, no_slice_report=True)
+  assert simulate.parse_args(['--truck_count', '3', '--no_slice_report']) == expected
+  assert simulate.parse_args(['--no_csv']) == simulate.Args(no_csv=True)
+  assert simulate.parse_args(['--seed', '4']) == simulate.Args(seed=4)
 
 def test_initialize_simulation_definition():
-  simulate.ARGS = simulate.parse_args()
+  simulate.ARGS = simulate.parse_args([])
   expected = simulate.MiningRun(num_stations=1, num_trucks=1, run_hours=72, total_loads_collected=0, total_load_count=0,
                                 total_idle_truck_time=0, total_busy_truck_time=0, total_idle_station_time=0,
                                 total_busy_station_time=0, verbose_trucks=False, verbose_stations=False)
@@ -56,7 +72,7 @@ def test_initialize_unloading_stations_one_station():
   assert detected != expected
 
 def test_summarize_truck_results():
-  simulate.ARGS = simulate.parse_args()
+  simulate.ARGS = simulate.parse_args([])
   sample_simulation_definition = simulate.MiningRun()
   sample_truck = simulate.Truck(simulate.MiningRun())
   simulate.summarize_truck_results(sample_simulation_definition, [sample_truck])
@@ -65,7 +81,15 @@ def test_summarize_truck_results():
   simulate.summarize_truck_results(sample_simulation_definition, [sample_truck])
   assert sample_simulation_definition.total_load_count == 1
 
-# Not adding more summarize Test Results, because I should remove the goofy 'time_logs"
+def test_summarize_truck_results_time_in_state():
+  simulate.ARGS = simulate.parse_args([])
+  sample_simulation_definition = simulate.MiningRun()
+  sample_truck = simulate.Truck(simulate.MiningRun())
+  sample_truck.time_in_state[simulate.TRUCK_IDLE] = 10
+  sample_truck.time_in_state[simulate.TRUCK_MINING] = 120
+  simulate.summarize_truck_results(sample_simulation_definition, [sample_truck])
+  assert sample_simulation_definition.total_idle_truck_time == 10
+  assert sample_simulation_definition.total_busy_truck_time == 120
 
 # Not adding test for 'generate final report' since it just generates a CSV file,
 # and I need to figure out how to test that outside the google ecosystem.
@@ -76,10 +100,65 @@ def test_run_simulation():
   sample_station = simulate.Station(sample_simulation)
   detected =simulate.run_simulation(sample_simulation, [sample_station], [sample_truck])
 
-  expected = [['', 'Mining Truck', '', '', '', '', '', 'Unloading Station'],
-              ['Slice Count', 'MINING', 'TRAVELING_TO_STATION', 'IDLE',
-               'UNLOADING', 'TRAVELING_TO_MINE', 'BUSY', 'IDLE']] 
-  assert expected == detected
+  # A zero hour run has no slices, the column headers are kept separately.
+  assert detected.shape == (0, 8)
+
+def test_initialize_time_slice_body():
+  detected = simulate.initialize_time_slice_body(3)
+  assert detected.shape == (3, 8)
+  assert list(detected[:, 0]) == [0, 1, 2]
+  assert not detected[:, 1:].any()
+
+def test_run_simulation_without_slices():
+  for run_function in (simulate.run_simulation, simulate.run_simulation_core, simulate.run_simulation_events):
+    sample_simulation = simulate.MiningRun(num_trucks=2, num_stations=2, run_hours=6, seed=3)
+    trucks = simulate.initialize_trucks(sample_simulation)
+    stations = simulate.initialize_unloading_stations(sample_simulation)
+    detected = run_function(sample_simulation, stations, trucks, record_slices=False)
+    assert detected.shape == (0, 8)
+    # The run itself still happens.
+    assert sum(truck.completed_loads for truck in trucks) > 0
+
+def test_simulation_empty_run_writes_no_csv(tmp_path, monkeypatch):
+  monkeypatch.chdir(tmp_path)
+  detected = simulate.simulation(simulate.MiningRun(num_trucks=1, num_stations=1, run_hours=0))
+  assert detected.time_slice_report.shape == (0, 8)
+  assert not (tmp_path / 'mining_report.csv').exists()
+
+def test_simulation_without_csv(tmp_path, monkeypatch):
+  monkeypatch.chdir(tmp_path)
+  simulate.simulation(simulate.MiningRun(num_trucks=1, num_stations=1, run_hours=1), write_csv=False)
+  assert not (tmp_path / 'mining_report.csv').exists()
+
+def test_run_simulation_core_matches_run_simulation():
+  # Seeded runs hand out the same mining times in the same order, so every implementation must agree exactly.
+  # Verbose trucks are stepped one at a time, the others count down as a fleet or jump between events.
+  # Travel times of 7 or -5 minutes never count down to zero, so those trucks never arrive, on every path alike.
+  for num_trucks, num_stations, inbound_travel_time in ((5, 2, 30), (2, 3, 7), (3, 1, -5)):
+    reports = []
+    for run_function, verbose_trucks in ((simulate.run_simulation, True), (simulate.run_simulation, False),
+                                         (simulate.run_simulation_core, False),
+                                         (simulate.run_simulation_events, False)):
+      sample_simulation = simulate.MiningRun(num_trucks=num_trucks, num_stations=num_stations, run_hours=12, seed=3,
+                                             inbound_travel_time=inbound_travel_time, verbose_trucks=verbose_trucks)
+      trucks = simulate.initialize_trucks(sample_simulation)
+      stations = simulate.initialize_unloading_stations(sample_simulation)
+      time_slice_report = run_function(sample_simulation, stations, trucks)
+      reports.append((time_slice_report.tolist(), [truck.time_in_state for truck in trucks],
+                      [truck.remaining_time for truck in trucks], [station.busy_minutes for station in stations]))
+    assert reports[0] == reports[1] == reports[2] == reports[3]
+
+def test_run_grid():
+  simulate.ARGS = simulate.parse_args([])
+  detected = simulate.run_grid([1, 2], [1], 12, seed=5)
+  assert detected.shape == (2, 1, 3)
+  # Seeded runs come out the same in a worker process.
+  assert tuple(detected[1, 0]) == simulate.grid_run(2, 1, 12, seed=5)
+  # Seeded results are remembered, an overlapping sweep reuses them in its own order.
+  assert simulate.GRID_RESULTS[(2, 1, 12, 5)] == tuple(detected[1, 0])
+  assert simulate.run_grid([2, 1], [1], 12, seed=5).tolist() == detected[::-1].tolist()
+  simulate.run_grid([1], [1], 12)
+  assert (1, 1, 12, None) not in simulate.GRID_RESULTS
 
 
 # ToDo, increase unit test coverage as project time permits